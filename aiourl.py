@@ -0,0 +1,185 @@
+"""asyncio support for url.py, for Python 3.6 and later.
+
+Parsing is CPU bound, so parsing URLs inline in a coroutine blocks the event
+loop. AsyncURLPipeline hands batches of URL strings to an executor instead,
+and yields the parsed URLs in the order the strings came in.
+
+"""
+import asyncio
+
+from url import URL, URLError, _unicode
+
+# Marks the end of the input
+_END = object()
+
+def _parse_batch(values, parse, useDefaults, fileExtensionOptional, skipErrors, validate):
+    """Parses a list of URL strings in an executor, returning the results in order"""
+    results = []
+    for value in values:
+        try:
+            if not isinstance(value, (str, _unicode)):
+                raise URLError("Not a URL string: %r" % (value,))
+            if validate and not URL.validate(value):
+                raise URLError("Not a valid URL: %r" % value)
+            results.append(parse(value, useDefaults, fileExtensionOptional))
+        except URLError:
+            if not skipErrors:
+                raise
+    return results
+
+
+class AsyncURLPipeline(object):
+    """Parses URL strings put into a bounded queue, in batches run in an executor.
+
+    put() waits while maxQueued strings are waiting, and at most concurrency
+    batches of up to batchSize strings are parsed or waiting to be read at
+    once, so a slow consumer slows the producers down rather than letting
+    memory grow. Iterating over the pipeline, or over process(source), yields
+    the results in input order.
+
+    executor defaults to the event loop's thread pool, which keeps the loop
+    responsive. A concurrent.futures.ProcessPoolExecutor also spreads the
+    parsing across CPUs, as long as parse can be pickled. parse is URL by
+    default, or parse_components for lighter records. With validate=True,
+    strings URL.validate() rejects count as errors, as do values that are
+    not strings. Errors stop the pipeline with a URLError, or are skipped if
+    skipErrors is True. An error raised by the source itself reaches the
+    consumer after the results of the values before it.
+
+    """
+    def __init__(self, concurrency=2, batchSize=500, maxQueued=10000, executor=None, parse=URL,
+            useDefaults=False, fileExtensionOptional=False, skipErrors=False, validate=False):
+        if concurrency < 1 or batchSize < 1 or maxQueued < 1:
+            raise ValueError('concurrency, batchSize and maxQueued must be at least 1')
+        self.batchSize = batchSize
+        self.executor = executor
+        self.concurrency = concurrency
+        self.maxQueued = maxQueued
+        self._options = (parse, useDefaults is True, fileExtensionOptional is True,
+            skipErrors is True, validate is True)
+        # made by _start() on the running loop, as before Python 3.10 queues
+        # bind to the loop current when they are made
+        self._input = self._batches = self._slots = None
+        self._batcher = None
+        self.inFlight = 0
+        self.maxDepth = 0
+        self.parsed = 0
+
+    @property
+    def depth(self):
+        """The number of strings waiting to be batched"""
+        return self._input.qsize() if self._input is not None else 0
+
+    def stats(self):
+        """Returns the queue depth, its highest point, batches in flight and results yielded"""
+        return {'depth': self.depth, 'maxDepth': self.maxDepth,
+            'inFlight': self.inFlight, 'parsed': self.parsed}
+
+    async def put(self, value):
+        """Queues a URL string, waiting while the queue is full"""
+        self._start()
+        await self._input.put(value)
+        depth = self._input.qsize()
+        if depth > self.maxDepth:
+            self.maxDepth = depth
+
+    async def close(self):
+        """Marks the end of the input, once the strings already put are parsed"""
+        self._start()
+        await self._input.put(_END)
+
+    def _start(self):
+        if self._batcher is None:
+            self._input = asyncio.Queue(self.maxQueued)
+            self._batches = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self.concurrency)
+            self._batcher = asyncio.ensure_future(self._batch())
+
+    async def _batch(self):
+        loop = asyncio.get_event_loop()
+        get, getNowait = self._input.get, self._input.get_nowait
+        while True:
+            value = await get()
+            if value is _END:
+                break
+            batch = [value]
+            end = False
+            # take what is already queued, rather than wait for a full batch
+            while len(batch) < self.batchSize:
+                try:
+                    value = getNowait()
+                except asyncio.QueueEmpty:
+                    break
+                if value is _END:
+                    end = True
+                    break
+                batch.append(value)
+            await self._slots.acquire()
+            self.inFlight += 1
+            self._batches.put_nowait(loop.run_in_executor(self.executor, _parse_batch, batch, *self._options))
+            if end:
+                break
+        self._batches.put_nowait(None)
+
+    async def results(self):
+        """Yields the parsed URLs in input order, until the input is closed"""
+        self._start()
+        while True:
+            future = await self._batches.get()
+            if future is None:
+                return
+            try:
+                results = await future
+            finally:
+                self.inFlight -= 1
+                self._slots.release()
+            for result in results:
+                self.parsed += 1
+                yield result
+
+    def __aiter__(self):
+        return self.results()
+
+    async def process(self, source):
+        """Yields the parsed URLs for each string in source, an iterable or async iterable"""
+        feeder = asyncio.ensure_future(self._feed(source))
+        try:
+            async for result in self.results():
+                yield result
+            # raises what the source raised, if anything
+            await feeder
+        finally:
+            self.cancel()
+            if not feeder.done():
+                feeder.cancel()
+            elif not feeder.cancelled():
+                # retrieved, so asyncio does not report it as lost
+                feeder.exception()
+
+    async def _feed(self, source):
+        try:
+            if hasattr(source, '__aiter__'):
+                async for value in source:
+                    await self.put(value)
+            else:
+                for value in source:
+                    await self.put(value)
+        finally:
+            # ends the results even if the source fails
+            await self.close()
+
+    def cancel(self):
+        """Stops batching, for when the results are no longer wanted"""
+        if self._batcher is not None and not self._batcher.done():
+            self._batcher.cancel()
+
+
+async def aparse(source, concurrency=2, batchSize=500, executor=None, useDefaults=False,
+        fileExtensionOptional=False, skipErrors=False, validate=False):
+    """Yields a URL for each string in source, an iterable or async iterable,
+    parsed in batches in an executor, see AsyncURLPipeline.
+    """
+    pipeline = AsyncURLPipeline(concurrency, batchSize, executor=executor, useDefaults=useDefaults,
+        fileExtensionOptional=fileExtensionOptional, skipErrors=skipErrors, validate=validate)
+    async for url in pipeline.process(source):
+        yield url
@@ -0,0 +1,109 @@
+import asyncio
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+from url import URL, URLComponents, URLError, parse_components
+from aiourl import AsyncURLPipeline, aparse
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+async def collect(results):
+    return [result async for result in results]
+
+async def ticks(values):
+    for value in values:
+        await asyncio.sleep(0)
+        yield value
+
+VALUES = ['http://www.example%d.com/page.html?id=%d' % (i % 7, i) for i in range(250)]
+
+class TestAsyncPipeline(unittest.TestCase):
+
+    def test_aparse_order(self):
+        urls = run(collect(aparse(VALUES, concurrency=3, batchSize=16)))
+        self.assertEqual([url.query for url in urls], ['id=%d' % i for i in range(250)])
+        self.assertEqual(urls[8], URL(VALUES[8]))
+
+    def test_aparse_async_source(self):
+        urls = run(collect(aparse(ticks(VALUES[:20]), batchSize=4)))
+        self.assertEqual([str(url) for url in urls], VALUES[:20])
+
+    def test_errors(self):
+        values = ['http://www.example.com/', 'http://', 'https://www.example.com/']
+        with self.assertRaises(URLError):
+            run(collect(aparse(values)))
+        urls = run(collect(aparse(values, skipErrors=True)))
+        self.assertEqual([url.protocol for url in urls], ['http', 'https'])
+
+    def test_non_strings(self):
+        values = ['http://www.example.com/', None, 5, b'http://www.example.org/', 'ftp://ftp.example.com/']
+        with self.assertRaises(URLError):
+            run(collect(aparse(values)))
+        urls = run(collect(aparse(values, skipErrors=True)))
+        self.assertEqual([url.protocol for url in urls], ['http', 'ftp'])
+
+    def test_source_error(self):
+        def source():
+            yield 'http://www.example.com/'
+            raise ValueError('source failed')
+        urls = []
+        async def go():
+            async for url in aparse(source()):
+                urls.append(url)
+        with self.assertRaises(ValueError):
+            run(asyncio.wait_for(go(), 5))
+        self.assertEqual([str(url) for url in urls], ['http://www.example.com/'])
+
+    def test_validate(self):
+        values = ['http://www.example.com/', 'http://localhost/', 'ftp://ftp.example.com/']
+        urls = run(collect(aparse(values, skipErrors=True, validate=True)))
+        self.assertEqual([url.protocol for url in urls], ['http', 'ftp'])
+
+    def test_backpressure(self):
+        async def go():
+            pipeline = AsyncURLPipeline(concurrency=1, batchSize=2, maxQueued=3)
+            async def produce():
+                for value in VALUES[:40]:
+                    await pipeline.put(value)
+                await pipeline.close()
+            producer = asyncio.ensure_future(produce())
+            urls = []
+            async for url in pipeline:
+                urls.append(url)
+                self.assertLessEqual(pipeline.depth, 3)
+                self.assertLessEqual(pipeline.inFlight, 1)
+                await asyncio.sleep(0)
+            await producer
+            return pipeline, urls
+        pipeline, urls = run(go())
+        self.assertEqual(len(urls), 40)
+        self.assertEqual(pipeline.stats(), {'depth': 0, 'maxDepth': 3, 'inFlight': 0, 'parsed': 40})
+
+    def test_made_outside_loop(self):
+        pipeline = AsyncURLPipeline(batchSize=16)
+        self.assertEqual(pipeline.depth, 0)
+        urls = run(collect(pipeline.process(VALUES)))
+        self.assertEqual([str(url) for url in urls], VALUES)
+
+    def test_process_pool(self):
+        async def go(executor):
+            pipeline = AsyncURLPipeline(batchSize=50, executor=executor, parse=parse_components)
+            return await collect(pipeline.process(VALUES))
+        with ProcessPoolExecutor(2) as executor:
+            parts = run(go(executor))
+        self.assertEqual(len(parts), 250)
+        self.assertEqual(parts[3], parse_components(VALUES[3]))
+        self.assertIsInstance(parts[3], URLComponents)
+
+    def test_arguments(self):
+        with self.assertRaises(ValueError):
+            AsyncURLPipeline(concurrency=0)
+
+if __name__ == '__main__':
+    unittest.main()